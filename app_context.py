@@ -0,0 +1,104 @@
+import logging
+import threading
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class AppContext:
+    """Shared bot components, each built once on first use"""
+    
+    def __init__(self, bot_token: str = None, config_file='config.json',
+                 users_file='users.json', stats_file='bot_stats.json',
+                 base_url: str = 'https://api.telegram.org/bot'):
+        self.bot_token = bot_token
+        self.base_url = base_url
+        self.config_file = config_file
+        self.users_file = users_file
+        self.stats_file = stats_file
+        
+        self._components: Dict[str, object] = {}
+        self._factories: Dict[str, Callable] = {
+            'news_fetcher': self._build_news_fetcher,
+            'user_manager': self._build_user_manager,
+            'stats_manager': self._build_stats_manager,
+            'rate_limiter': self._build_rate_limiter,
+            'reply_cache': self._build_reply_cache,
+            'scheduler': self._build_scheduler
+        }
+        self._locks = {name: threading.Lock() for name in self._factories}
+    
+    def _get(self, name: str):
+        """Return a component, building it if this is the first access"""
+        component = self._components.get(name)
+        if component is not None:
+            return component
+        
+        # Callers racing the background loader wait for it instead of loading twice
+        with self._locks[name]:
+            if name not in self._components:
+                self._components[name] = self._factories[name]()
+            return self._components[name]
+    
+    def _build_news_fetcher(self):
+        from news_fetcher import NewsFetcher
+        return NewsFetcher(self.config_file)
+    
+    def _build_user_manager(self):
+        from user_data import UserDataManager
+        return UserDataManager(self.users_file)
+    
+    def _build_stats_manager(self):
+        from stats import StatsManager
+        return StatsManager(self.stats_file)
+    
+    def _build_rate_limiter(self):
+        from rate_limiter import RateLimiter
+        return RateLimiter()
+    
+    def _build_reply_cache(self):
+        from reply_cache import ReplyCache
+        return ReplyCache()
+    
+    def _build_scheduler(self):
+        from scheduler import NewsScheduler
+        return NewsScheduler(self.bot_token, self.news_fetcher, self.user_manager, self.base_url)
+    
+    @property
+    def news_fetcher(self):
+        return self._get('news_fetcher')
+    
+    @property
+    def user_manager(self):
+        return self._get('user_manager')
+    
+    @property
+    def stats_manager(self):
+        return self._get('stats_manager')
+    
+    @property
+    def rate_limiter(self):
+        return self._get('rate_limiter')
+    
+    @property
+    def reply_cache(self):
+        return self._get('reply_cache')
+    
+    @property
+    def scheduler(self):
+        return self._get('scheduler')
+    
+    def load_in_background(self, start_scheduler: bool = False) -> threading.Thread:
+        """Load the data files on a daemon thread so polling can start right away"""
+        def load():
+            try:
+                self.news_fetcher
+                self.user_manager
+                self.stats_manager
+                if start_scheduler:
+                    self.scheduler.start_scheduler()
+            except Exception:
+                logger.exception("Error loading bot data")
+        
+        thread = threading.Thread(target=load, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs
+
+FAKE_BOT_TOKEN = '123456:BENCHMARK-fake-token'
+
+
+class _BotAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        """Keep the benchmark output quiet"""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        params = {key: values[0] for key, values in parse_qs(body).items()}
+        method = self.path.rsplit('/', 1)[-1]
+        result = self.server.fake_api.handle(method, params)
+        payload = json.dumps({'ok': True, 'result': result}).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST
+
+
+class FakeTelegramServer:
+    """Minimal local stand-in for the Telegram Bot API"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), _BotAPIHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake_api = self
+        self.lock = threading.Lock()
+        self.next_message_id = 1
+        self.method_counts: Dict[str, int] = {}
+        self.sent_messages: List[Dict] = []
+        self.record_messages = False
+        # Simulated network round trip per sendMessage, in seconds
+        self.latency = 0
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to pass to telegram.Bot(base_url=...)"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    def handle(self, method: str, params: Dict) -> Dict:
+        """Build the result for a Bot API call"""
+        with self.lock:
+            self.method_counts[method] = self.method_counts.get(method, 0) + 1
+            message_id = self.next_message_id
+            self.next_message_id += 1
+
+        if method == 'getMe':
+            return {
+                'id': int(FAKE_BOT_TOKEN.split(':')[0]),
+                'is_bot': True,
+                'first_name': 'Benchmark',
+                'username': 'benchmark_bot'
+            }
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        chat_id = int(json.loads(params.get('chat_id', '0')))
+        text = params.get('text', '')
+        if self.record_messages:
+            with self.lock:
+                self.sent_messages.append({
+                    'chat_id': chat_id,
+                    'text': text,
+                    'received_at': time.perf_counter()
+                })
+
+        return {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': text
+        }
+
+    def messages_sent(self) -> int:
+        """Number of sendMessage calls received so far"""
+        return self.method_counts.get('sendMessage', 0)
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self.lock:
+            self.method_counts.clear()
+            self.sent_messages.clear()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,59 @@
+import json
+import os
+from datetime import date, timedelta
+
+from benchmarks.rss_fixtures import RSSFixtureServer
+
+ADMIN_USER_ID = 1
+
+
+def write_config(workdir: str, rss_server: RSSFixtureServer):
+    """config.json pointing every category at the local fixture server"""
+    config = {
+        'news_sources': rss_server.news_sources(),
+        'schedule_times': ['09:00', '18:00'],
+        'max_articles_per_delivery': 2,
+        'max_articles_per_request': 5,
+        'admin_user_ids': [ADMIN_USER_ID]
+    }
+    with open(os.path.join(workdir, 'config.json'), 'w') as f:
+        json.dump(config, f, indent=2)
+
+
+def write_users(workdir: str, subscribers: int):
+    """users.json with every user on general and every other user on tech too"""
+    users = {}
+    for index in range(subscribers):
+        subscriptions = ['general', 'tech'] if index % 2 == 0 else ['general']
+        users[str(1000 + index)] = {
+            'username': f"user{index}",
+            'subscriptions': subscriptions,
+            'active': True,
+            'last_news_time': None
+        }
+    with open(os.path.join(workdir, 'users.json'), 'w') as f:
+        json.dump(users, f)
+
+
+def write_stats(workdir: str, days: int, users_per_day: int = 1000):
+    """bot_stats.json with a long history of daily stats"""
+    first_day = date(2024, 1, 1)
+    daily_stats = {
+        (first_day + timedelta(days=day)).isoformat(): {
+            'commands': users_per_day * 3,
+            'unique_users': list(range(1000 + day, 1000 + day + users_per_day))
+        }
+        for day in range(days)
+    }
+    stats = {
+        'total_users': users_per_day * days,
+        'commands_used': {
+            'start': 0, 'help': 0, 'news': 0, 'tech': 0, 'business': 0,
+            'subscribe': 0, 'unsubscribe': 0, 'mysubs': 0
+        },
+        'daily_stats': daily_stats,
+        'category_requests': {'general': 0, 'tech': 0, 'business': 0},
+        'subscription_counts': {'general': 0, 'tech': 0, 'business': 0}
+    }
+    with open(os.path.join(workdir, 'bot_stats.json'), 'w') as f:
+        json.dump(stats, f)
@@ -0,0 +1,72 @@
+import random
+import string
+import time
+from typing import Dict, List
+
+from benchmarks.rss_fixtures import build_feed
+
+KEYWORDS_PER_USER = 5
+
+
+def build_vocabulary(size: int, rng: random.Random) -> List[str]:
+    """Distinct made-up words and two word phrases to follow"""
+    vocabulary = set()
+    while len(vocabulary) < size:
+        word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+        if rng.random() < 0.2:
+            word += ' ' + ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+        vocabulary.add(word)
+    return sorted(vocabulary)
+
+
+def build_articles(count: int, vocabulary: List[str], rng: random.Random) -> List[Dict]:
+    """Article texts similar in length to the feeds, each mentioning a few followed keywords"""
+    import feedparser
+
+    entries = feedparser.parse(build_feed('Keyword Wire', 'general', 50)).entries
+    articles = []
+    for index in range(count):
+        entry = entries[index % len(entries)]
+        mentions = ' '.join(rng.sample(vocabulary, 3))
+        articles.append({'title': f"{entry.title} {mentions}", 'summary': entry.summary})
+    return articles
+
+
+def bench_keyword_matching(filters: int, articles: int = 2000, seed: int = 7) -> Dict:
+    """Compile `filters` user keyword filters into one matcher and scan articles with it"""
+    from keyword_matcher import KeywordMatcher
+
+    rng = random.Random(seed)
+    users = max(1, filters // KEYWORDS_PER_USER)
+    vocabulary = build_vocabulary(max(KEYWORDS_PER_USER, users // 4), rng)
+
+    keyword_users = {}
+    for user_index in range(users):
+        for keyword in rng.sample(vocabulary, KEYWORDS_PER_USER):
+            keyword_users.setdefault(keyword, []).append(str(1000 + user_index))
+
+    texts = [f"{item['title']} {item['summary']}" for item in build_articles(articles, vocabulary, rng)]
+
+    build_started = time.perf_counter()
+    matcher = KeywordMatcher(keyword_users)
+    build_ms = (time.perf_counter() - build_started) * 1000
+
+    latencies = []
+    notifications = 0
+    started = time.perf_counter()
+    for text in texts:
+        article_started = time.perf_counter()
+        notifications += len(matcher.match(text))
+        latencies.append(time.perf_counter() - article_started)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'filters': users * KEYWORDS_PER_USER,
+        'distinct_keywords': len(keyword_users),
+        'articles': articles,
+        'notifications': notifications,
+        'build_ms': round(build_ms, 2),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_per_s': round(articles / elapsed, 2),
+        'latencies': latencies
+    }
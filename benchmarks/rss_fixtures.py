@@ -0,0 +1,113 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+CATEGORY_SOURCES = {
+    'general': ['World Wire', 'Daily Globe', 'Evening Post'],
+    'tech': ['Byte Review', 'Circuit News', 'Open Source Weekly'],
+    'business': ['Market Desk']
+}
+
+
+def build_feed(source_name: str, category: str, articles: int, revision: int = 0) -> bytes:
+    """Render a deterministic RSS 2.0 document"""
+    now = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc) + timedelta(hours=revision)
+    slug = source_name.lower().replace(' ', '-')
+    items = []
+
+    for index in range(articles):
+        published = format_datetime(now - timedelta(minutes=index * 7))
+        title = f"{source_name} {category} story {revision}-{index}"
+        summary = f"Synthetic {category} summary number {index} from {source_name}. " * 5
+        items.append(
+            "<item>"
+            f"<title>{escape(title)}</title>"
+            f"<link>https://example.com/{slug}/{revision}/{index}</link>"
+            f"<description>{escape(summary)}</description>"
+            f"<pubDate>{published}</pubDate>"
+            "</item>"
+        )
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel>'
+        f"<title>{escape(source_name)}</title>"
+        f"<link>https://example.com/{slug}</link>"
+        f"<description>{escape(source_name)} fixture feed</description>"
+        f"{''.join(items)}"
+        '</channel></rss>'
+    ).encode('utf-8')
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        """Keep the benchmark output quiet"""
+
+    def do_GET(self):
+        body = self.server.fixtures.documents.get(self.path)
+        status = 200 if body is not None else 404
+        body = body or b''
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class RSSFixtureServer:
+    """Serves generated RSS feeds for every configured category"""
+
+    def __init__(self, articles_per_feed: int = 20, host: str = '127.0.0.1', port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), _FeedHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fixtures = self
+        self.articles_per_feed = articles_per_feed
+        self.revisions: Dict[str, int] = {category: 0 for category in CATEGORY_SOURCES}
+        self.documents: Dict[str, bytes] = {}
+        self.thread = None
+        for category in CATEGORY_SOURCES:
+            self._render(category)
+
+    def _path(self, category: str, source_name: str) -> str:
+        return f"/feeds/{category}/{source_name.lower().replace(' ', '-')}.xml"
+
+    def _render(self, category: str):
+        for source_name in CATEGORY_SOURCES[category]:
+            self.documents[self._path(category, source_name)] = build_feed(
+                source_name, category, self.articles_per_feed, self.revisions[category]
+            )
+
+    def bump(self, category: str):
+        """Publish a fresh set of articles for a category"""
+        self.revisions[category] += 1
+        self._render(category)
+
+    def news_sources(self) -> Dict[str, List[Dict]]:
+        """The news_sources section of a config.json pointing at this server"""
+        host, port = self.httpd.server_address[:2]
+        return {
+            category: [
+                {
+                    'name': source_name,
+                    'url': f"http://{host}:{port}{self._path(category, source_name)}",
+                    'active': True
+                }
+                for source_name in sources
+            ]
+            for category, sources in CATEGORY_SOURCES.items()
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,340 @@
+"""Offline end-to-end benchmarks for the news bot.
+
+Spins up a fake Telegram Bot API and an RSS fixture server on localhost,
+drives the handlers in main.py with a synthetic update stream and runs
+NewsScheduler fan-outs at several subscriber counts, scans articles
+against a million compiled keyword filters, measures how sharded
+delivery scales with worker processes and times a cold
+start of main.py against large users.json/bot_stats.json files.
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --tiers 1000,10000 --save-baseline
+    python -m benchmarks.run_benchmarks --tiers '' --startup-users 500000
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from telegram import Bot, Update
+
+from benchmarks.fake_telegram import FAKE_BOT_TOKEN, FakeTelegramServer
+from benchmarks.keywords import bench_keyword_matching
+from benchmarks.fixtures import ADMIN_USER_ID, write_config, write_users
+from benchmarks.rss_fixtures import RSSFixtureServer
+from benchmarks.sharding import bench_sharded_delivery
+from benchmarks.startup import bench_startup
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# (command, weight, args) - roughly what real traffic looks like
+COMMAND_MIX = [
+    ('start', 10, []),
+    ('help', 5, []),
+    ('news', 25, []),
+    ('tech', 20, []),
+    ('business', 10, []),
+    ('subscribe', 12, ['tech']),
+    ('unsubscribe', 5, ['tech']),
+    ('mysubs', 10, []),
+    ('follow', 5, ['open', 'source']),
+    ('following', 3, []),
+    ('adminstats', 3, [])
+]
+
+
+class BenchContext:
+    """Stand-in for ContextTypes.DEFAULT_TYPE with just what the handlers use"""
+
+    def __init__(self, bot: Bot, args: List[str]):
+        self.bot = bot
+        self.args = args
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb() -> float:
+    """High-water mark of the process RSS; scenarios run smallest first so growth shows up"""
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+
+
+def summarize_latencies(latencies: List[float]) -> Dict:
+    """Latency percentiles in milliseconds"""
+    ordered = sorted(latencies)
+    return {
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3)
+    }
+
+
+def build_update_stream(users: int, updates: int, seed: int = 42) -> List[Dict]:
+    """Synthetic /command updates from a pool of users"""
+    rng = random.Random(seed)
+    commands = list(COMMAND_MIX)
+    weights = [entry[1] for entry in COMMAND_MIX]
+    stream = []
+
+    for update_id in range(1, updates + 1):
+        command, _, args = rng.choices(commands, weights=weights)[0]
+        user_id = ADMIN_USER_ID if command == 'adminstats' else 1000 + rng.randrange(users)
+        text = ' '.join([f"/{command}"] + args)
+        stream.append({
+            'update_id': update_id,
+            'message': {
+                'message_id': update_id,
+                'date': 1704110400 + update_id,
+                'chat': {'id': user_id, 'type': 'private'},
+                'from': {'id': user_id, 'is_bot': False, 'first_name': f"user{user_id}", 'username': f"user{user_id}"},
+                'text': text,
+                'entities': [{'type': 'bot_command', 'offset': 0, 'length': len(command) + 1}]
+            }
+        })
+
+    return stream
+
+
+def handler_table(bot_module) -> Dict:
+    """Command name -> handler coroutine in main.py"""
+    return {
+        'start': bot_module.start,
+        'help': bot_module.help_command,
+        'news': bot_module.news_command,
+        'tech': bot_module.tech_news_command,
+        'business': bot_module.business_news_command,
+        'subscribe': bot_module.subscribe_command,
+        'unsubscribe': bot_module.unsubscribe_command,
+        'mysubs': bot_module.mysubs_command,
+        'follow': bot_module.follow_command,
+        'following': bot_module.following_command,
+        'adminstats': bot_module.admin_stats_command
+    }
+
+
+async def bench_handlers(bot_module, telegram_server: FakeTelegramServer, users: int, updates: int) -> Dict:
+    """Feed the update stream through main.py's handlers one update at a time"""
+    bot = Bot(FAKE_BOT_TOKEN, base_url=telegram_server.base_url)
+    handlers = handler_table(bot_module)
+    stream = [Update.de_json(data, bot) for data in build_update_stream(users, updates)]
+    latencies = []
+
+    async with bot:
+        telegram_server.reset()
+        started = time.perf_counter()
+
+        for update in stream:
+            command, *args = update.message.text[1:].split()
+            handler_started = time.perf_counter()
+            await handlers[command](update, BenchContext(bot, args))
+            latencies.append(time.perf_counter() - handler_started)
+
+        elapsed = time.perf_counter() - started
+
+    return {
+        'updates': updates,
+        'users': users,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_per_s': round(updates / elapsed, 2),
+        **summarize_latencies(latencies),
+        'messages_sent': telegram_server.messages_sent(),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def bench_fanout(workdir: str, telegram_server: FakeTelegramServer, subscribers: int) -> Dict:
+    """Run one scheduled delivery job against a users.json of the given size.
+
+    Throughput is users reached per second, since one digest may be one or more messages.
+    """
+    from scheduler import NewsScheduler
+
+    write_users(workdir, subscribers)
+    news_scheduler = NewsScheduler(FAKE_BOT_TOKEN)
+    news_scheduler.bot = Bot(FAKE_BOT_TOKEN, base_url=telegram_server.base_url)
+    news_scheduler.message_delay = 0
+
+    telegram_server.reset()
+    telegram_server.record_messages = True
+    started = time.perf_counter()
+
+    news_scheduler.schedule_news_job()
+
+    elapsed = time.perf_counter() - started
+    telegram_server.record_messages = False
+
+    # Delivery lag: time from job start until each message reached the API
+    lags = [message['received_at'] - started for message in telegram_server.sent_messages]
+    messages = telegram_server.messages_sent()
+    recipients = len({message['chat_id'] for message in telegram_server.sent_messages})
+
+    return {
+        'subscribers': subscribers,
+        'recipients': recipients,
+        'messages_sent': messages,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_per_s': round(recipients / elapsed, 2) if elapsed else 0.0,
+        **summarize_latencies(lags),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """List of human readable regressions beyond the tolerance"""
+    regressions = []
+
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+
+        if 'throughput_per_s' in current and current['throughput_per_s'] < previous['throughput_per_s'] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {current['throughput_per_s']}/s vs baseline {previous['throughput_per_s']}/s"
+            )
+        for metric in ('p95_ms', 'ready_ms', 'loaded_ms', 'peak_rss_mb'):
+            if previous.get(metric) and metric in current and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {current[metric]} vs baseline {previous[metric]}")
+
+    return regressions
+
+
+def print_report(results: Dict):
+    columns = ['throughput_per_s', 'p50_ms', 'p95_ms', 'p99_ms', 'peak_rss_mb', 'elapsed_s']
+    print(f"{'scenario':<18}" + ''.join(f"{column:>18}" for column in columns))
+    for name, result in results.items():
+        if 'throughput_per_s' in result:
+            print(f"{name:<18}" + ''.join(f"{result.get(column, '-'):>18}" for column in columns))
+
+    for name, result in results.items():
+        if 'throughput_per_s' not in result:
+            print(f"\n{name}: " + ', '.join(f"{key}={value}" for key, value in result.items()))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=200, help='distinct users in the update stream')
+    parser.add_argument('--updates', type=int, default=1000, help='updates fed through the handlers')
+    parser.add_argument('--tiers', default='1000,10000,100000', help='comma separated subscriber counts for fan-out')
+    parser.add_argument('--keyword-filters', type=int, default=1000000, help='user keyword filters compiled into the matcher, 0 skips it')
+    parser.add_argument('--shard-workers', default='1,2,4', help='comma separated worker counts for sharded delivery')
+    parser.add_argument('--shard-subscribers', type=int, default=1000, help='subscribers for sharded delivery')
+    parser.add_argument('--api-latency-ms', type=float, default=20, help='simulated Bot API round trip for sharded delivery')
+    parser.add_argument('--startup-users', type=int, default=200000, help='users.json size for the startup benchmark, 0 skips it')
+    parser.add_argument('--startup-days', type=int, default=365, help='days of daily stats in the startup bot_stats.json')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline results to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='overwrite the baseline with this run')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown before flagging')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    tiers = [int(tier) for tier in args.tiers.split(',') if tier]
+    original_cwd = os.getcwd()
+
+    telegram_server = FakeTelegramServer()
+    rss_server = RSSFixtureServer()
+    telegram_server.start()
+    rss_server.start()
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix='newsbot-bench-') as workdir:
+            # The bot reads config.json, users.json and bot_stats.json from the cwd
+            os.chdir(workdir)
+            write_config(workdir, rss_server)
+            os.environ['TELEGRAM_BOT_TOKEN'] = FAKE_BOT_TOKEN
+
+            bot_module = importlib.import_module('main')
+            # main.py logs every HTTP call at INFO, which would dominate the timings
+            logging.getLogger().setLevel(logging.WARNING)
+            results['handlers'] = asyncio.run(
+                bench_handlers(bot_module, telegram_server, args.users, args.updates)
+            )
+            for tier in tiers:
+                results[f"fanout_{tier}"] = bench_fanout(workdir, telegram_server, tier)
+            if args.keyword_filters:
+                keyword_result = bench_keyword_matching(args.keyword_filters)
+                latencies = keyword_result.pop('latencies')
+                keyword_result.update(summarize_latencies(latencies))
+                keyword_result['peak_rss_mb'] = peak_rss_mb()
+                results['keyword_match'] = keyword_result
+            single_worker = None
+            for workers in [int(count) for count in args.shard_workers.split(',') if count]:
+                result = bench_sharded_delivery(
+                    os.path.join(workdir, 'sharded'), rss_server, telegram_server,
+                    workers, args.shard_subscribers, args.api_latency_ms
+                )
+                result.update(summarize_latencies(result.pop('lags')))
+                single_worker = single_worker or result['throughput_per_s']
+                result['speedup'] = round(result['throughput_per_s'] / single_worker, 2)
+                results[f"sharded_{workers}w"] = result
+            if args.startup_users:
+                results['startup'] = bench_startup(
+                    os.path.join(workdir, 'startup'), rss_server, args.startup_users, args.startup_days
+                )
+
+            os.chdir(original_cwd)
+    finally:
+        os.chdir(original_cwd)
+        telegram_server.stop()
+        rss_server.stop()
+
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        # Merge so a partial run only refreshes the scenarios it ran
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline found, run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import os
+import time
+from typing import Dict
+
+from benchmarks.fake_telegram import FakeTelegramServer
+from benchmarks.fixtures import write_config, write_users
+from benchmarks.rss_fixtures import RSSFixtureServer
+
+
+def bench_sharded_delivery(workdir: str, rss_server: RSSFixtureServer, telegram_server: FakeTelegramServer,
+                           workers: int, subscribers: int, api_latency_ms: float) -> Dict:
+    """Scheduled delivery to `subscribers` users split across `workers` shard processes"""
+    from sharding import FEED_CACHE_FILE, SHARD_MANIFEST_FILE, ShardedBot
+
+    os.makedirs(workdir, exist_ok=True)
+    original_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for filename in os.listdir(workdir):
+            if '.shard' in filename or filename in (FEED_CACHE_FILE, SHARD_MANIFEST_FILE):
+                os.remove(filename)
+        write_config(workdir, rss_server)
+        write_users(workdir, subscribers)
+
+        sharded = ShardedBot(
+            os.environ['TELEGRAM_BOT_TOKEN'], workers,
+            base_url=telegram_server.base_url, message_delay=0, start_schedulers=False
+        )
+        sharded.start()
+
+        telegram_server.reset()
+        telegram_server.record_messages = True
+        telegram_server.latency = api_latency_ms / 1000
+        try:
+            started = time.perf_counter()
+            sharded.deliver()
+            elapsed = time.perf_counter() - started
+        finally:
+            telegram_server.latency = 0
+            telegram_server.record_messages = False
+            sharded.stop()
+    finally:
+        os.chdir(original_cwd)
+
+    messages = telegram_server.messages_sent()
+    # Delivery lag: time from the delivery request until each message reached the API
+    lags = [message['received_at'] - started for message in telegram_server.sent_messages]
+    return {
+        'workers': workers,
+        'subscribers': subscribers,
+        'api_latency_ms': api_latency_ms,
+        'messages_sent': messages,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_per_s': round(messages / elapsed, 2),
+        'lags': lags
+    }
@@ -0,0 +1,56 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict
+
+from benchmarks.fixtures import write_config, write_stats, write_users
+from benchmarks.rss_fixtures import RSSFixtureServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter so nothing is already imported or loaded
+STARTUP_SCRIPT = '''
+import json, resource, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import main
+imported = time.perf_counter()
+main.build_application()
+loader = main.app.load_in_background()
+ready = time.perf_counter()
+loader.join()
+loaded = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'ready_ms': (ready - started) * 1000,
+    'loaded_ms': (loaded - started) * 1000,
+    'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}))
+'''
+
+
+def bench_startup(workdir: str, rss_server: RSSFixtureServer, users: int, days: int, repeats: int = 3) -> Dict:
+    """Median cold start time of main.py over a few runs.
+
+    import_ms is `import main`, ready_ms is the point where main() would start
+    polling and loaded_ms is when users.json and bot_stats.json are in memory.
+    """
+    os.makedirs(workdir, exist_ok=True)
+    write_config(workdir, rss_server)
+    write_users(workdir, users)
+    write_stats(workdir, days)
+
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', STARTUP_SCRIPT, REPO_ROOT],
+            cwd=workdir, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    result = {'users': users, 'stats_days': days}
+    for metric in ('import_ms', 'ready_ms', 'loaded_ms', 'peak_rss_mb'):
+        result[metric] = round(statistics.median(run[metric] for run in runs), 2)
+    return result
@@ -0,0 +1,105 @@
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from telegram.helpers import escape_markdown
+
+CATEGORY_ICONS = {
+    'general': '📰',
+    'tech': '💻',
+    'business': '📈'
+}
+
+# Telegram rejects longer messages
+MAX_MESSAGE_LENGTH = 4096
+
+# Fingerprints are fixed length so a user's seen list can be stored as one string
+ARTICLE_ID_LENGTH = 10
+
+def article_id(item: Dict) -> str:
+    """Short, stable fingerprint of an article"""
+    key = item.get('link') or item.get('title', '')
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:ARTICLE_ID_LENGTH]
+
+class DigestBuilder:
+    """Builds one message per user covering all of their subscribed categories.
+
+    Candidates are fetched once per category and rendered text is shared by
+    every user who ends up with the same articles, so a run costs one render
+    per distinct digest rather than one per user.
+    """
+
+    def __init__(self, news_fetcher, articles_per_category: int = 2, candidate_pool: int = 20):
+        self.news_fetcher = news_fetcher
+        self.articles_per_category = articles_per_category
+        self.candidate_pool = candidate_pool
+        self.candidates: Dict[str, List[Tuple[str, Dict]]] = {}
+        self.rendered: Dict[Tuple, str] = {}
+
+    def get_candidates(self, category: str) -> List[Tuple[str, Dict]]:
+        """Newest articles of a category with their fingerprints"""
+        if category not in self.candidates:
+            items = self.news_fetcher.get_news(category, self.candidate_pool)
+            self.candidates[category] = [(article_id(item), item) for item in items]
+        return self.candidates[category]
+
+    def select(self, subscriptions: Tuple[str, ...], seen: List[str]) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+        """Pick the newest unseen articles of each subscribed category"""
+        seen_ids = set(seen)
+        selection = []
+
+        for category in subscriptions:
+            picked = []
+            for article_hash, _ in self.get_candidates(category):
+                if article_hash not in seen_ids:
+                    picked.append(article_hash)
+                    if len(picked) == self.articles_per_category:
+                        break
+            if picked:
+                selection.append((category, tuple(picked)))
+
+        return tuple(selection)
+
+    def render(self, selection: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> str:
+        """Markdown text for a selection, rendered once per distinct selection"""
+        if selection in self.rendered:
+            return self.rendered[selection]
+
+        sections = ["📰 *Your News Digest*"]
+        for category, article_hashes in selection:
+            items = dict(self.get_candidates(category))
+            icon = CATEGORY_ICONS.get(category, '•')
+            lines = [f"{icon} *{category.title()}*"]
+            for article_hash in article_hashes:
+                item = items[article_hash]
+                # One unescaped * or _ in any title would make Telegram reject the whole digest
+                lines.append(f"• {escape_markdown(item['title'])}\n{escape_markdown(item['summary'])}\n[Read more]({item['link']})")
+            sections.append('\n\n'.join(lines))
+
+        text = '\n\n'.join(sections)
+        self.rendered[selection] = text
+        return text
+
+    def drop_last_article(self, selection: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+        """The same selection without its last article"""
+        category, article_hashes = selection[-1]
+        if len(article_hashes) > 1:
+            return selection[:-1] + ((category, article_hashes[:-1]),)
+        return selection[:-1]
+
+    def build(self, subscriptions: Tuple[str, ...], seen: List[str]) -> Optional[Tuple[str, List[str]]]:
+        """Digest text and the article fingerprints it contains, or None if nothing is new"""
+        selection = self.select(subscriptions, seen)
+        if not selection:
+            return None
+
+        text = self.render(selection)
+
+        # Cutting the text would break the Markdown, so leave whole articles for the next run
+        while selection and len(text) > MAX_MESSAGE_LENGTH:
+            selection = self.drop_last_article(selection)
+            text = self.render(selection)
+
+        if not selection:
+            return None
+
+        article_hashes = [article_hash for _, hashes in selection for article_hash in hashes]
+        return text, article_hashes
@@ -0,0 +1,91 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+def normalize_keyword(keyword: str) -> str:
+    """Lowercase a keyword and collapse its whitespace"""
+    return ' '.join(keyword.lower().split())
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over every followed keyword.
+    
+    All users' keywords are compiled into one automaton, so an article is
+    scanned once no matter how many filters exist, and the cost only grows
+    with the length of the text and the number of hits.
+    """
+    
+    def __init__(self, keyword_users: Dict[str, Iterable[str]]):
+        self.keyword_users: Dict[str, List[str]] = {}
+        # Node 0 is the root; each node has transitions, a failure link and the keywords ending there
+        self.transitions: List[Dict[str, int]] = [{}]
+        self.failure: List[int] = [0]
+        self.outputs: List[List[str]] = [[]]
+        
+        for keyword, users in keyword_users.items():
+            keyword = normalize_keyword(keyword)
+            if keyword:
+                self.keyword_users.setdefault(keyword, []).extend(users)
+        
+        for keyword in self.keyword_users:
+            self._add(keyword)
+        self._link()
+    
+    def _add(self, keyword: str):
+        node = 0
+        for char in keyword:
+            next_node = self.transitions[node].get(char)
+            if next_node is None:
+                next_node = len(self.transitions)
+                self.transitions[node][char] = next_node
+                self.transitions.append({})
+                self.failure.append(0)
+                self.outputs.append([])
+            node = next_node
+        self.outputs[node].append(keyword)
+    
+    def _link(self):
+        """Compute failure links breadth first and merge outputs along them"""
+        queue = deque(self.transitions[0].values())
+        
+        while queue:
+            node = queue.popleft()
+            for char, child in self.transitions[node].items():
+                queue.append(child)
+                
+                fallback = self.failure[node]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.failure[fallback]
+                target = self.transitions[fallback].get(char, 0)
+                self.failure[child] = target if target != child else 0
+                
+                if self.outputs[self.failure[child]]:
+                    self.outputs[child] = self.outputs[child] + self.outputs[self.failure[child]]
+    
+    def find_keywords(self, text: str) -> Set[str]:
+        """Every keyword that occurs in the text as a whole word or phrase"""
+        text = normalize_keyword(text)
+        found = set()
+        node = 0
+        
+        for end, char in enumerate(text):
+            while node and char not in self.transitions[node]:
+                node = self.failure[node]
+            node = self.transitions[node].get(char, 0)
+            
+            for keyword in self.outputs[node]:
+                start = end - len(keyword) + 1
+                # Only whole words, so "ai" doesn't match "said"
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if end + 1 < len(text) and text[end + 1].isalnum():
+                    continue
+                found.add(keyword)
+        
+        return found
+    
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """Map each interested user to the keywords of theirs found in the text"""
+        interested = {}
+        for keyword in self.find_keywords(text):
+            for user_id in self.keyword_users[keyword]:
+                interested.setdefault(user_id, set()).add(keyword)
+        return interested
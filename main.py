@@ -1,13 +1,15 @@
+from __future__ import annotations
+
 import os
+import argparse
 import logging
+from typing import TYPE_CHECKING, Tuple
 from dotenv import load_dotenv
-from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes
-from news_fetcher import NewsFetcher
-from user_data import UserDataManager
-from scheduler import NewsScheduler
-from stats import StatsManager
-from rate_limiter import RateLimiter
+from app_context import AppContext
+
+if TYPE_CHECKING:
+    from telegram import Bot, Update
+    from telegram.ext import Application, ContextTypes
 
 load_dotenv()
 
@@ -19,34 +21,47 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
-news_fetcher = NewsFetcher()
-user_manager = UserDataManager()
-scheduler = NewsScheduler(BOT_TOKEN)
-stats_manager = StatsManager()
-rate_limiter = RateLimiter()
+
+# Components are built on first use, see AppContext
+app = AppContext(BOT_TOKEN)
 
 def is_admin(user_id: int) -> bool:
     """Check if user is an admin"""
-    admin_ids = news_fetcher.config.get('admin_user_ids', [])
+    admin_ids = app.news_fetcher.config.get('admin_user_ids', [])
     return user_id in admin_ids
 
+def get_news_replies(category: str, icon: str) -> list:
+    """Get ready-to-send news messages for a category, rendering them only when the articles change"""
+    version = app.news_fetcher.get_articles_version(category)
+    messages = app.reply_cache.get(category, version)
+    
+    if messages is None:
+        news_items = app.news_fetcher.get_news(category, 3)
+        messages = [
+            f"{icon} *{item['title']}*\n\n{item['summary']}\n\nSource: {item['source']}\n[Read more]({item['link']})"
+            for item in news_items
+        ]
+        app.reply_cache.put(category, version, messages)
+    
+    return messages
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send a message when the command /start is issued."""
     user_id = update.effective_user.id
     username = update.effective_user.username
     
-    is_new_user = str(user_id) not in user_manager.users_data
-    user_manager.register_user(user_id, username)
+    is_new_user = str(user_id) not in app.user_manager.users_data
+    app.user_manager.register_user(user_id, username)
     
     if is_new_user:
-        stats_manager.record_new_user()
+        app.stats_manager.record_new_user()
     
-    stats_manager.record_command_usage('start', user_id)
+    app.stats_manager.record_command_usage('start', user_id)
     await update.message.reply_text('Hi! I am your news bot. Use /help to see available commands.')
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send a message when the command /help is issued."""
-    stats_manager.record_command_usage('help', update.effective_user.id)
+    app.stats_manager.record_command_usage('help', update.effective_user.id)
     
     help_text = """
 Available commands:
@@ -58,6 +73,9 @@ Available commands:
 /subscribe - Subscribe to news categories
 /unsubscribe - Unsubscribe from categories
 /mysubs - Show your subscriptions
+/follow - Get alerts for articles mentioning a keyword
+/unfollow - Stop following a keyword
+/following - Show the keywords you follow
     """
     await update.message.reply_text(help_text)
 
@@ -67,26 +85,25 @@ async def news_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         user_id = update.effective_user.id
         
         # Check rate limit
-        allowed, message = rate_limiter.is_allowed(user_id)
+        allowed, message = app.rate_limiter.is_allowed(user_id)
         if not allowed:
             await update.message.reply_text(f"⚠️ {message}")
             return
         
-        stats_manager.record_command_usage('news', user_id)
-        stats_manager.record_news_request('general')
+        app.stats_manager.record_command_usage('news', user_id)
+        app.stats_manager.record_news_request('general')
         
         await update.message.reply_text("Fetching latest news...")
         
-        news_items = news_fetcher.get_news('general', 3)
+        messages = get_news_replies('general', '📰')
         
-        if not news_items:
+        if not messages:
             await update.message.reply_text("Sorry, no news available right now. Please try again later.")
             logger.warning("No news items returned for general category")
             return
         
-        for item in news_items:
+        for message in messages:
             try:
-                message = f"📰 *{item['title']}*\n\n{item['summary']}\n\nSource: {item['source']}\n[Read more]({item['link']})"
                 await update.message.reply_text(message, parse_mode='Markdown', disable_web_page_preview=True)
             except Exception as e:
                 logger.error(f"Error sending news item: {e}")
@@ -101,26 +118,25 @@ async def tech_news_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         user_id = update.effective_user.id
         
         # Check rate limit
-        allowed, message = rate_limiter.is_allowed(user_id)
+        allowed, message = app.rate_limiter.is_allowed(user_id)
         if not allowed:
             await update.message.reply_text(f"⚠️ {message}")
             return
         
-        stats_manager.record_command_usage('tech', user_id)
-        stats_manager.record_news_request('tech')
+        app.stats_manager.record_command_usage('tech', user_id)
+        app.stats_manager.record_news_request('tech')
         
         await update.message.reply_text("Fetching latest tech news...")
         
-        news_items = news_fetcher.get_news('tech', 3)
+        messages = get_news_replies('tech', '💻')
         
-        if not news_items:
+        if not messages:
             await update.message.reply_text("Sorry, no tech news available right now. Please try again later.")
             logger.warning("No news items returned for tech category")
             return
         
-        for item in news_items:
+        for message in messages:
             try:
-                message = f"💻 *{item['title']}*\n\n{item['summary']}\n\nSource: {item['source']}\n[Read more]({item['link']})"
                 await update.message.reply_text(message, parse_mode='Markdown', disable_web_page_preview=True)
             except Exception as e:
                 logger.error(f"Error sending tech news item: {e}")
@@ -132,10 +148,10 @@ async def tech_news_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def subscribe_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Subscribe to news categories."""
     try:
-        stats_manager.record_command_usage('subscribe', update.effective_user.id)
+        app.stats_manager.record_command_usage('subscribe', update.effective_user.id)
         
         user_id = update.effective_user.id
-        available_categories = news_fetcher.get_available_categories()
+        available_categories = app.news_fetcher.get_available_categories()
         
         if not context.args:
             categories_text = ', '.join(available_categories)
@@ -149,10 +165,10 @@ async def subscribe_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text(f"Invalid category. Available categories: {categories_text}")
             return
         
-        user_manager.register_user(user_id, update.effective_user.username)
+        app.user_manager.register_user(user_id, update.effective_user.username)
         
-        if user_manager.add_subscription(user_id, category):
-            stats_manager.record_subscription_change(category, True)
+        if app.user_manager.add_subscription(user_id, category):
+            app.stats_manager.record_subscription_change(category, True)
             await update.message.reply_text(f"✅ Successfully subscribed to {category} news!")
             logger.info(f"User {user_id} subscribed to {category}")
         else:
@@ -164,12 +180,12 @@ async def subscribe_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def unsubscribe_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Unsubscribe from news categories."""
-    stats_manager.record_command_usage('unsubscribe', update.effective_user.id)
+    app.stats_manager.record_command_usage('unsubscribe', update.effective_user.id)
     
     user_id = update.effective_user.id
     
     if not context.args:
-        subs = user_manager.get_user_subscriptions(user_id)
+        subs = app.user_manager.get_user_subscriptions(user_id)
         if subs:
             await update.message.reply_text(f"Please specify a category to unsubscribe from.\nYour subscriptions: {', '.join(subs)}\nExample: /unsubscribe tech")
         else:
@@ -178,18 +194,18 @@ async def unsubscribe_command(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     category = context.args[0].lower()
     
-    if user_manager.remove_subscription(user_id, category):
-        stats_manager.record_subscription_change(category, False)
+    if app.user_manager.remove_subscription(user_id, category):
+        app.stats_manager.record_subscription_change(category, False)
         await update.message.reply_text(f"✅ Successfully unsubscribed from {category} news!")
     else:
         await update.message.reply_text(f"❌ You weren't subscribed to {category} news!")
 
 async def mysubs_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show user's subscriptions."""
-    stats_manager.record_command_usage('mysubs', update.effective_user.id)
+    app.stats_manager.record_command_usage('mysubs', update.effective_user.id)
     
     user_id = update.effective_user.id
-    subscriptions = user_manager.get_user_subscriptions(user_id)
+    subscriptions = app.user_manager.get_user_subscriptions(user_id)
     
     if subscriptions:
         subs_text = '\n'.join([f"• {sub}" for sub in subscriptions])
@@ -197,32 +213,96 @@ async def mysubs_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     else:
         await update.message.reply_text("You have no active subscriptions.\nUse /subscribe <category> to subscribe to news.")
 
+async def follow_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Follow a keyword or phrase across all news categories."""
+    user_id = update.effective_user.id
+    app.stats_manager.record_command_usage('follow', user_id)
+    
+    if not context.args:
+        await update.message.reply_text("Please specify a keyword to follow.\nExample: /follow climate change")
+        return
+    
+    keyword = ' '.join(context.args).lower()
+    if not 2 <= len(keyword) <= 50:
+        await update.message.reply_text("Keywords must be between 2 and 50 characters long.")
+        return
+    
+    # Alerts are sent as Markdown, keep its control characters out of keywords
+    if any(char in keyword for char in '_*[`'):
+        await update.message.reply_text("Keywords can't contain _ * [ or ` characters.")
+        return
+    
+    app.user_manager.register_user(user_id, update.effective_user.username)
+    
+    max_keywords = app.news_fetcher.config.get('max_keywords_per_user', 20)
+    if len(app.user_manager.get_user_keywords(user_id)) >= max_keywords:
+        await update.message.reply_text(f"❌ You can follow at most {max_keywords} keywords. Use /unfollow to remove one.")
+        return
+    
+    if app.user_manager.add_keyword(user_id, keyword):
+        await update.message.reply_text(f"✅ You'll get alerts for new articles mentioning \"{keyword}\"!")
+        logger.info(f"User {user_id} followed keyword {keyword}")
+    else:
+        await update.message.reply_text(f"❌ You're already following \"{keyword}\"!")
+
+async def unfollow_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Stop following a keyword."""
+    user_id = update.effective_user.id
+    app.stats_manager.record_command_usage('unfollow', user_id)
+    
+    if not context.args:
+        keywords = app.user_manager.get_user_keywords(user_id)
+        if keywords:
+            await update.message.reply_text(f"Please specify a keyword to unfollow.\nYou follow: {', '.join(keywords)}\nExample: /unfollow {keywords[0]}")
+        else:
+            await update.message.reply_text("You don't follow any keywords.")
+        return
+    
+    keyword = ' '.join(context.args)
+    
+    if app.user_manager.remove_keyword(user_id, keyword):
+        await update.message.reply_text(f"✅ Stopped following \"{keyword.lower()}\"!")
+    else:
+        await update.message.reply_text(f"❌ You weren't following \"{keyword.lower()}\"!")
+
+async def following_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show the keywords a user follows."""
+    user_id = update.effective_user.id
+    app.stats_manager.record_command_usage('following', user_id)
+    
+    keywords = app.user_manager.get_user_keywords(user_id)
+    
+    if keywords:
+        keywords_text = '\n'.join([f"• {keyword}" for keyword in keywords])
+        await update.message.reply_text(f"🔎 Keywords you follow:\n{keywords_text}")
+    else:
+        await update.message.reply_text("You don't follow any keywords.\nUse /follow <keyword> to get alerts for matching articles.")
+
 async def business_news_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send latest business news."""
     try:
         user_id = update.effective_user.id
         
         # Check rate limit
-        allowed, message = rate_limiter.is_allowed(user_id)
+        allowed, message = app.rate_limiter.is_allowed(user_id)
         if not allowed:
             await update.message.reply_text(f"⚠️ {message}")
             return
         
-        stats_manager.record_command_usage('business', user_id)
-        stats_manager.record_news_request('business')
+        app.stats_manager.record_command_usage('business', user_id)
+        app.stats_manager.record_news_request('business')
         
         await update.message.reply_text("Fetching latest business news...")
         
-        news_items = news_fetcher.get_news('business', 3)
+        messages = get_news_replies('business', '📈')
         
-        if not news_items:
+        if not messages:
             await update.message.reply_text("Sorry, no business news available right now. Please try again later.")
             logger.warning("No news items returned for business category")
             return
         
-        for item in news_items:
+        for message in messages:
             try:
-                message = f"📈 *{item['title']}*\n\n{item['summary']}\n\nSource: {item['source']}\n[Read more]({item['link']})"
                 await update.message.reply_text(message, parse_mode='Markdown', disable_web_page_preview=True)
             except Exception as e:
                 logger.error(f"Error sending business news item: {e}")
@@ -240,7 +320,8 @@ async def admin_stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
     
     try:
-        stats_summary = stats_manager.get_stats_summary()
+        stats_summary = app.stats_manager.get_stats_summary()
+        stats_summary += f"\n{app.reply_cache.get_stats_summary()}"
         await update.message.reply_text(stats_summary, parse_mode='Markdown')
     except Exception as e:
         logger.error(f"Error in admin_stats_command: {e}")
@@ -259,16 +340,21 @@ async def admin_broadcast_command(update: Update, context: ContextTypes.DEFAULT_
         return
     
     message = ' '.join(context.args)
-    active_users = user_manager.get_all_active_users()
     
+    await update.message.reply_text(f"Broadcasting message to {len(app.user_manager.get_all_active_users())} users...")
+    
+    sent_count, failed_count = await broadcast_message(context.bot, message)
+    
+    await update.message.reply_text(f"✅ Broadcast complete!\nSent: {sent_count}\nFailed: {failed_count}")
+
+async def broadcast_message(bot: Bot, message: str) -> Tuple[int, int]:
+    """Send a broadcast to every active user, returning (sent, failed) counts"""
     sent_count = 0
     failed_count = 0
     
-    await update.message.reply_text(f"Broadcasting message to {len(active_users)} users...")
-    
-    for user_id_str in active_users:
+    for user_id_str in app.user_manager.get_all_active_users():
         try:
-            await context.bot.send_message(
+            await bot.send_message(
                 chat_id=int(user_id_str),
                 text=f"📢 *Broadcast Message*\n\n{message}",
                 parse_mode='Markdown'
@@ -278,7 +364,7 @@ async def admin_broadcast_command(update: Update, context: ContextTypes.DEFAULT_
             failed_count += 1
             logger.error(f"Failed to send broadcast to user {user_id_str}: {e}")
     
-    await update.message.reply_text(f"✅ Broadcast complete!\nSent: {sent_count}\nFailed: {failed_count}")
+    return sent_count, failed_count
 
 async def admin_user_info_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Get user information (admin only)"""
@@ -296,13 +382,13 @@ async def admin_user_info_command(update: Update, context: ContextTypes.DEFAULT_
         target_user_id = int(context.args[0])
         user_id_str = str(target_user_id)
         
-        if user_id_str not in user_manager.users_data:
+        if user_id_str not in app.user_manager.users_data:
             await update.message.reply_text("User not found in database.")
             return
         
-        user_data = user_manager.users_data[user_id_str]
+        user_data = app.user_manager.users_data[user_id_str]
         subscriptions = user_data.get('subscriptions', [])
-        rate_stats = rate_limiter.get_user_stats(target_user_id)
+        rate_stats = app.rate_limiter.get_user_stats(target_user_id)
         
         info = f"""👤 *User Information*
         
@@ -323,13 +409,11 @@ Requests last hour: {rate_stats['requests_last_hour']}/{rate_stats['hour_limit']
         logger.error(f"Error in admin_user_info_command: {e}")
         await update.message.reply_text("Sorry, there was an error retrieving user information.")
 
-def main():
-    """Run the bot."""
-    if not BOT_TOKEN:
-        logger.error("No bot token provided!")
-        return
+def build_application(base_url: str = 'https://api.telegram.org/bot') -> Application:
+    """Build the Telegram application with all command handlers registered."""
+    from telegram.ext import Application, CommandHandler
     
-    application = Application.builder().token(BOT_TOKEN).build()
+    application = Application.builder().token(BOT_TOKEN).base_url(base_url).build()
     
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("help", help_command))
@@ -339,13 +423,49 @@ def main():
     application.add_handler(CommandHandler("subscribe", subscribe_command))
     application.add_handler(CommandHandler("unsubscribe", unsubscribe_command))
     application.add_handler(CommandHandler("mysubs", mysubs_command))
+    application.add_handler(CommandHandler("follow", follow_command))
+    application.add_handler(CommandHandler("unfollow", unfollow_command))
+    application.add_handler(CommandHandler("following", following_command))
     
     # Admin commands
     application.add_handler(CommandHandler("adminstats", admin_stats_command))
     application.add_handler(CommandHandler("broadcast", admin_broadcast_command))
     application.add_handler(CommandHandler("userinfo", admin_user_info_command))
     
-    scheduler.start_scheduler()
+    return application
+
+def main():
+    """Run the bot."""
+    parser = argparse.ArgumentParser(description='Telegram news bot')
+    parser.add_argument('--shards', type=int, default=1, help='worker processes, each owning a partition of the users')
+    args = parser.parse_args()
+    
+    if not BOT_TOKEN:
+        logger.error("No bot token provided!")
+        return
+    
+    from sharding import ShardedBot, check_shard_count
+    
+    # Also runs for a single process, the plain data files are stale once they have been split
+    try:
+        check_shard_count(args.shards)
+    except ValueError as e:
+        logger.error(e)
+        return
+    
+    if args.shards > 1:
+        try:
+            ShardedBot(BOT_TOKEN, args.shards).run()
+        except RuntimeError as e:
+            logger.error(e)
+        return
+    
+    from telegram import Update
+    
+    application = build_application()
+    
+    # Users and stats load while polling starts; handlers wait for them if they arrive first
+    app.load_in_background(start_scheduler=True)
     
     application.run_polling(allowed_updates=Update.ALL_TYPES)
 
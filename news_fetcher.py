@@ -1,13 +1,22 @@
-import feedparser
-import requests
+import hashlib
 import json
 import os
-from datetime import datetime
+import time
+
+# How many links per category are remembered as already announced
+MAX_ANNOUNCED_LINKS = 1000
 
 class NewsFetcher:
     def __init__(self, config_file='config.json'):
         self.config = self.load_config(config_file)
         self.feeds = self.build_feeds_dict()
+        self.cache_ttl = self.config.get('news_cache_ttl', 300)
+        self.article_cache = {}
+        # category -> links already handed out as new, a dict used as an ordered set
+        self.announced_links = {}
+        # Set in sharded workers, which read articles published by the front process
+        self.shared_cache_file = None
+        self.shared_cache_mtime = None
     
     def load_config(self, config_file):
         """Load configuration from JSON file"""
@@ -33,13 +42,9 @@ class NewsFetcher:
             feeds[category] = [source['url'] for source in sources if source.get('active', True)]
         return feeds
     
-    def get_news(self, category='general', limit=None):
-        """Fetch news from RSS feeds"""
-        if category not in self.feeds:
-            return []
-        
-        if limit is None:
-            limit = self.config.get('max_articles_per_request', 5)
+    def fetch_articles(self, category):
+        """Fetch and merge all articles of a category from its RSS feeds"""
+        import feedparser  # deferred, it is slow to import and only needed once feeds are fetched
         
         all_entries = []
         
@@ -63,7 +68,126 @@ class NewsFetcher:
             except Exception as e:
                 print(f"Error fetching from {feed_url}: {e}")
         
-        return sorted(all_entries, key=lambda x: x.get('published', ''), reverse=True)[:limit]
+        return sorted(all_entries, key=lambda x: x.get('published', ''), reverse=True)
+    
+    def get_articles(self, category):
+        """Get the cached article set of a category, refetching it once the TTL expires"""
+        if self.shared_cache_file:
+            self.sync_shared_cache()
+            return self.article_cache.get(category) or {'entries': [], 'digest': '', 'version': 0, 'fetched_at': 0}
+        
+        cached = self.article_cache.get(category)
+        if cached and time.time() - cached['fetched_at'] < self.cache_ttl:
+            return cached
+        
+        entries = self.fetch_articles(category)
+        
+        # Every feed failing looks like an empty category, keep serving the last good articles
+        if not entries and cached:
+            cached['fetched_at'] = time.time()
+            return cached
+        
+        return self.store_articles(category, entries)
+    
+    def store_articles(self, category, entries):
+        """Cache a category's article set, versioning it"""
+        cached = self.article_cache.get(category)
+        digest = hashlib.sha1(json.dumps(entries, sort_keys=True).encode('utf-8')).hexdigest()
+        
+        # The version only moves when the articles actually changed
+        version = 1
+        if cached:
+            version = cached['version'] if cached['digest'] == digest else cached['version'] + 1
+        
+        self.article_cache[category] = {
+            'entries': entries,
+            'digest': digest,
+            'version': version,
+            'fetched_at': time.time()
+        }
+        return self.article_cache[category]
+    
+    def use_shared_cache(self, cache_file):
+        """Read articles from a snapshot published by another process instead of fetching feeds"""
+        self.shared_cache_file = cache_file
+        self.shared_cache_mtime = None
+    
+    def sync_shared_cache(self):
+        """Reload the shared snapshot if it has been republished since the last read"""
+        try:
+            mtime = os.stat(self.shared_cache_file).st_mtime_ns
+        except OSError:
+            return
+        
+        if mtime == self.shared_cache_mtime:
+            return
+        
+        try:
+            with open(self.shared_cache_file, 'r') as f:
+                snapshot = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error loading shared feed cache: {e}")
+            return
+        
+        self.shared_cache_mtime = mtime
+        for category, entries in snapshot.items():
+            self.store_articles(category, entries)
+    
+    def publish_shared_cache(self, cache_file):
+        """Refresh every category and write the articles to a snapshot other processes can read"""
+        snapshot = {category: self.get_articles(category)['entries'] for category in self.feeds}
+        
+        # Write then rename so readers never see a half written file
+        temp_file = f"{cache_file}.tmp"
+        try:
+            with open(temp_file, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(temp_file, cache_file)
+        except IOError as e:
+            print(f"Error publishing shared feed cache: {e}")
+    
+    def take_new_articles(self, category):
+        """Cached articles of a category not taken before, remembering them as taken.
+        
+        Compared against every link announced recently rather than the previous
+        fetch, so articles that come back after a feed outage are not news again.
+        The first call for a category only records the baseline.
+        """
+        cached = self.article_cache.get(category)
+        if not cached:
+            return []
+        
+        announced = self.announced_links.get(category)
+        is_baseline = announced is None
+        if is_baseline:
+            announced = self.announced_links[category] = {}
+        
+        new_entries = [entry for entry in cached['entries'] if entry['link'] not in announced]
+        
+        # Move links still in the feed to the end so only ones gone from it get evicted
+        for entry in cached['entries']:
+            announced.pop(entry['link'], None)
+            announced[entry['link']] = True
+        while len(announced) > max(MAX_ANNOUNCED_LINKS, len(cached['entries'])):
+            del announced[next(iter(announced))]
+        
+        return [] if is_baseline else new_entries
+    
+    def get_articles_version(self, category):
+        """Get the version of a category's current article set"""
+        if category not in self.feeds:
+            return 0
+        return self.get_articles(category)['version']
+    
+    def get_news(self, category='general', limit=None):
+        """Fetch news from RSS feeds"""
+        if category not in self.feeds:
+            return []
+        
+        if limit is None:
+            limit = self.config.get('max_articles_per_request', 5)
+        
+        return self.get_articles(category)['entries'][:limit]
     
     def get_available_categories(self):
         """Get list of available news categories"""
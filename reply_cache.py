@@ -0,0 +1,41 @@
+from typing import Dict, List, Optional, Tuple
+
+class ReplyCache:
+    def __init__(self):
+        # category -> (article set version, rendered messages)
+        self.entries: Dict[str, Tuple[int, List[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, category: str, version: int) -> Optional[List[str]]:
+        """Get rendered messages for a category if they match the article set version"""
+        entry = self.entries.get(category)
+        
+        if entry and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        
+        # Articles changed since this was rendered, drop it right away
+        if entry:
+            del self.entries[category]
+        
+        self.misses += 1
+        return None
+    
+    def put(self, category: str, version: int, messages: List[str]):
+        """Store rendered messages for a category's article set version"""
+        self.entries[category] = (version, messages)
+    
+    def get_stats_summary(self) -> str:
+        """Get formatted cache statistics"""
+        return format_cache_summary(self.hits, self.misses, len(self.entries))
+
+def format_cache_summary(hits: int, misses: int, categories: int) -> str:
+    """Get formatted cache statistics from raw counters, e.g. summed over shards"""
+    lookups = hits + misses
+    hit_ratio = hits / lookups if lookups else 0.0
+    return (
+        f"🗄️ Reply Cache:\n"
+        f"  Hit ratio: {hit_ratio:.1%} ({hits} hits / {misses} misses)\n"
+        f"  Cached categories: {categories}\n"
+    )
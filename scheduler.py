@@ -4,63 +4,169 @@ import time
 from datetime import datetime
 import threading
 from telegram import Bot
+from telegram.helpers import escape_markdown
 from news_fetcher import NewsFetcher
 from user_data import UserDataManager
+from digest import DigestBuilder, article_id
+from keyword_matcher import KeywordMatcher
+
+# Keyword alerts list at most this many articles per message
+MAX_ALERT_ARTICLES = 10
 
 class NewsScheduler:
-    def __init__(self, bot_token: str):
-        self.bot = Bot(token=bot_token)
-        self.news_fetcher = NewsFetcher()
-        self.user_manager = UserDataManager()
+    def __init__(self, bot_token: str, news_fetcher: NewsFetcher = None, user_manager: UserDataManager = None,
+                 base_url: str = 'https://api.telegram.org/bot'):
+        self.bot = Bot(token=bot_token, base_url=base_url)
+        # Reuse the bot's own instances when given so data files are only loaded once
+        self.news_fetcher = news_fetcher or NewsFetcher()
+        self.user_manager = user_manager or UserDataManager()
         self.running = False
+        self.message_delay = 1  # seconds between messages, keeps us under Telegram's flood limits
+        
+        self.keyword_matcher = None
+        self.keyword_matcher_version = None
     
-    async def send_scheduled_news(self, category: str = 'general'):
-        """Send scheduled news to subscribed users"""
+    async def send_digests(self):
+        """Send every subscribed user one digest of all their categories"""
+        config = self.news_fetcher.config
+        max_seen = config.get('max_seen_articles_per_user', 50)
+        builder = DigestBuilder(self.news_fetcher, config.get('max_articles_per_delivery', 2))
+        
         try:
-            news_items = self.news_fetcher.get_news(category, 2)
-            
-            if not news_items:
-                return
-            
-            active_users = self.user_manager.get_all_active_users()
-            
-            for user_id_str in active_users:
-                user_subscriptions = self.user_manager.get_user_subscriptions(int(user_id_str))
-                
-                if category in user_subscriptions:
+            for subscriptions, user_ids in self.user_manager.get_subscription_groups().items():
+                for user_id_str in user_ids:
+                    # Articles the user already got as a keyword alert aren't repeated in the digest
+                    seen = self.user_manager.get_seen_articles(user_id_str) + \
+                        self.user_manager.get_seen_articles(user_id_str, 'seen_alerts')
+                    digest = builder.build(subscriptions, seen)
+                    if digest is None:
+                        continue
+                    
+                    text, article_ids = digest
                     try:
                         await self.bot.send_message(
                             chat_id=int(user_id_str),
-                            text=f"📰 *Daily {category.title()} News Update*",
-                            parse_mode='Markdown'
+                            text=text,
+                            parse_mode='Markdown',
+                            disable_web_page_preview=True
                         )
-                        
-                        for item in news_items:
-                            message = f"• *{item['title']}*\n\n{item['summary']}\n\n[Read more]({item['link']})"
-                            await self.bot.send_message(
-                                chat_id=int(user_id_str),
-                                text=message,
-                                parse_mode='Markdown',
-                                disable_web_page_preview=True
-                            )
-                            await asyncio.sleep(1)
-                        
+                        self.user_manager.mark_articles_seen(user_id_str, article_ids, max_seen)
+                        await asyncio.sleep(self.message_delay)
                     except Exception as e:
-                        print(f"Error sending news to user {user_id_str}: {e}")
-                        
+                        print(f"Error sending digest to user {user_id_str}: {e}")
         except Exception as e:
             print(f"Error in scheduled news delivery: {e}")
+        finally:
+            self.user_manager.save_seen_data()
+    
+    async def send_all_scheduled_news(self):
+        """Deliver the scheduled digests in one event loop"""
+        # The bot's HTTP client is bound to the loop it was opened on, so open
+        # and close it per run instead of sharing it across asyncio.run() calls
+        async with self.bot:
+            await self.send_digests()
+    
+    def get_keyword_matcher(self) -> KeywordMatcher:
+        """Get the matcher for all followed keywords, rebuilt only after keywords change"""
+        version = self.user_manager.keywords_version
+        if self.keyword_matcher is None or self.keyword_matcher_version != version:
+            self.keyword_matcher = KeywordMatcher(self.user_manager.get_keyword_index())
+            self.keyword_matcher_version = version
+        return self.keyword_matcher
+    
+    def match_keyword_alerts(self, new_articles: list, pending: dict):
+        """Scan each newly ingested article once and queue it for every interested user"""
+        matcher = self.get_keyword_matcher()
+        if not matcher.keyword_users:
+            return
+        
+        for item in new_articles:
+            interested = matcher.match(f"{item['title']} {item['summary']}")
+            for user_id_str, keywords in interested.items():
+                pending.setdefault(user_id_str, []).append((item, sorted(keywords)))
+    
+    async def send_keyword_alerts(self):
+        """Refresh every feed and send users the new articles matching their keywords"""
+        # Ingest and matching happen only here, on the scheduler thread, never in a handler
+        pending = {}
+        for category in self.news_fetcher.get_available_categories():
+            self.news_fetcher.get_articles(category)
+            new_articles = self.news_fetcher.take_new_articles(category)
+            if new_articles:
+                self.match_keyword_alerts(new_articles, pending)
+        
+        if not pending:
+            return
+        
+        max_seen = self.news_fetcher.config.get('max_seen_alerts_per_user', 50)
+        
+        try:
+            for user_id_str, matches in pending.items():
+                # Skip what the user already got in an alert or in a digest
+                seen = set(self.user_manager.get_seen_articles(user_id_str, 'seen_alerts'))
+                seen.update(self.user_manager.get_seen_articles(user_id_str))
+                lines = ["🔎 *New articles matching your keywords*"]
+                article_ids = []
+                
+                # Filter before capping, anything past the cap has already been announced and is gone
+                for item, keywords in matches:
+                    if len(article_ids) == MAX_ALERT_ARTICLES:
+                        break
+                    item_id = article_id(item)
+                    if item_id in seen or item_id in article_ids:
+                        continue
+                    article_ids.append(item_id)
+                    # Titles and keywords are free text, unescaped * or _ make Telegram reject the message
+                    lines.append(
+                        f"• {escape_markdown(item['title'])} ({escape_markdown(', '.join(keywords))})\n"
+                        f"[Read more]({item['link']})"
+                    )
+                
+                if not article_ids:
+                    continue
+                
+                try:
+                    await self.bot.send_message(
+                        chat_id=int(user_id_str),
+                        text='\n\n'.join(lines),
+                        parse_mode='Markdown',
+                        disable_web_page_preview=True
+                    )
+                    self.user_manager.mark_articles_seen(user_id_str, article_ids, max_seen, 'seen_alerts')
+                    await asyncio.sleep(self.message_delay)
+                except Exception as e:
+                    print(f"Error sending keyword alert to user {user_id_str}: {e}")
+        finally:
+            self.user_manager.save_seen_data()
+    
+    async def run_keyword_alerts(self):
+        """Send keyword alerts in one event loop"""
+        async with self.bot:
+            await self.send_keyword_alerts()
+    
+    def keyword_alert_job(self):
+        """Wrapper function for the keyword alert job"""
+        # An exception escaping a job would end the schedule thread
+        try:
+            asyncio.run(self.run_keyword_alerts())
+        except Exception as e:
+            print(f"Error in keyword alert job: {e}")
     
     def schedule_news_job(self):
         """Wrapper function for scheduled job"""
-        asyncio.run(self.send_scheduled_news('general'))
-        asyncio.run(self.send_scheduled_news('tech'))
+        try:
+            asyncio.run(self.send_all_scheduled_news())
+        except Exception as e:
+            print(f"Error in scheduled news job: {e}")
     
     def start_scheduler(self):
         """Start the news scheduler"""
         schedule.every().day.at("09:00").do(self.schedule_news_job)
         schedule.every().day.at("18:00").do(self.schedule_news_job)
         
+        alert_interval = self.news_fetcher.config.get('keyword_alert_interval_minutes', 15)
+        schedule.every(alert_interval).minutes.do(self.keyword_alert_job)
+        
         self.running = True
         
         def run_schedule():
@@ -0,0 +1,387 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+import time
+import zlib
+from typing import Dict, List
+
+FEED_CACHE_FILE = 'feed_cache.json'
+# Records how many shards the data files were split for
+SHARD_MANIFEST_FILE = 'shards.json'
+TELEGRAM_API_URL = 'https://api.telegram.org/bot'
+
+# Admin commands that act on every user; the front runs them on every shard and replies once
+FANOUT_COMMANDS = {'adminstats', 'broadcast'}
+# How long /adminstats waits for the shards before giving up
+STATS_TIMEOUT = 30
+# Seconds between checks that every worker process is still running
+WORKER_CHECK_INTERVAL = 5
+
+logger = logging.getLogger(__name__)
+
+def shard_for(user_id, shards: int) -> int:
+    """Hash partition a user ID onto one of the shards"""
+    return zlib.crc32(str(user_id).encode('utf-8')) % shards
+
+def shard_file(filename: str, shard: int) -> str:
+    """Per-shard name of a data file, e.g. users.json -> users.shard2.json"""
+    base, ext = os.path.splitext(filename)
+    return f"{base}.shard{shard}{ext}"
+
+def check_shard_count(shards: int, users_file: str = 'users.json'):
+    """Make sure the data files fit the number of shards, 1 meaning the single process mode.
+    
+    Raises ValueError when the files were already split for a different
+    number of shards, since users would end up on shards that don't have
+    them, or a single process would run on the stale pre-split files.
+    """
+    if not os.path.exists(SHARD_MANIFEST_FILE):
+        return
+    
+    with open(SHARD_MANIFEST_FILE, 'r') as f:
+        split_for = json.load(f)['shards']
+    if split_for != shards:
+        raise ValueError(
+            f"The data files are split for {split_for} shards, not {shards}. "
+            f"Start with --shards {split_for}, or merge the shard files back into "
+            f"{users_file} and remove {SHARD_MANIFEST_FILE} to run with a different count."
+        )
+
+def prepare_shard_files(shards: int, users_file: str = 'users.json', stats_file: str = 'bot_stats.json'):
+    """Split the single process data files into per-shard files on the first sharded start"""
+    check_shard_count(shards, users_file)
+    if os.path.exists(SHARD_MANIFEST_FILE):
+        return
+    
+    if os.path.exists(users_file):
+        with open(users_file, 'r') as f:
+            users = json.load(f)
+        
+        partitions: List[Dict] = [{} for _ in range(shards)]
+        for uid, data in users.items():
+            partitions[shard_for(uid, shards)][uid] = data
+        
+        for shard, partition in enumerate(partitions):
+            with open(shard_file(users_file, shard), 'w') as f:
+                json.dump(partition, f, separators=(',', ':'))
+    
+    # Stats can't be split by user, so the history carries on in shard 0 and is summed with the rest
+    if os.path.exists(stats_file):
+        shutil.copyfile(stats_file, shard_file(stats_file, 0))
+    
+    with open(SHARD_MANIFEST_FILE, 'w') as f:
+        json.dump({'shards': shards}, f)
+
+def run_worker(shard: int, update_queue, result_queue, base_url: str = TELEGRAM_API_URL,
+               message_delay: float = None, start_scheduler: bool = True):
+    """Entry point of a worker process owning one partition of the users"""
+    import main
+    from app_context import AppContext
+    
+    # Swap in this shard's data files; the handlers in main.py only ever go through main.app
+    main.app = AppContext(
+        main.BOT_TOKEN,
+        users_file=shard_file('users.json', shard),
+        stats_file=shard_file('bot_stats.json', shard),
+        base_url=base_url
+    )
+    main.app.news_fetcher.use_shared_cache(FEED_CACHE_FILE)
+    
+    # One INFO line per Bot API call from every worker drowns out everything else
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    
+    scheduler = main.app.scheduler
+    if message_delay is not None:
+        scheduler.message_delay = message_delay
+    if start_scheduler:
+        scheduler.start_scheduler()
+    
+    application = main.build_application(base_url)
+    asyncio.run(serve_worker(shard, application, scheduler, update_queue, result_queue))
+
+async def serve_worker(shard: int, application, scheduler, update_queue, result_queue):
+    """Handle routed updates, delivery and fan-out commands until told to stop"""
+    import main
+    from telegram import Update
+    
+    loop = asyncio.get_running_loop()
+    
+    async with application:
+        result_queue.put(('ready', shard, None))
+        
+        while True:
+            kind, payload = await loop.run_in_executor(None, update_queue.get)
+            
+            if kind == 'stop':
+                break
+            
+            if kind == 'update':
+                try:
+                    await application.process_update(Update.de_json(payload, application.bot))
+                except Exception as e:
+                    logger.error(f"Shard {shard} failed to process update: {e}")
+            elif kind == 'deliver':
+                await scheduler.send_all_scheduled_news()
+                result_queue.put(('delivered', shard, None))
+            elif kind == 'adminstats':
+                # Only the counters, the daily history is too big to pass around and isn't shown
+                stats = main.app.stats_manager.stats
+                reply_cache = main.app.reply_cache
+                counters = {
+                    'stats': {key: stats[key] for key in ('total_users', 'commands_used', 'category_requests', 'subscription_counts')},
+                    'cache': (reply_cache.hits, reply_cache.misses, len(reply_cache.entries))
+                }
+                result_queue.put(('adminstats', shard, (payload, counters)))
+            elif kind == 'broadcast':
+                request_id, message = payload
+                counts = await main.broadcast_message(application.bot, message)
+                result_queue.put(('broadcast', shard, (request_id, counts)))
+
+class ShardedBot:
+    """Front process of the sharded run mode.
+    
+    Owns polling and feed ingestion, and routes each update to the worker
+    process that owns the user. Workers read the feeds from a snapshot the
+    front publishes, so the feeds are fetched once for all of them.
+    """
+    
+    def __init__(self, bot_token: str, shards: int, base_url: str = TELEGRAM_API_URL,
+                 message_delay: float = None, start_schedulers: bool = True):
+        self.bot_token = bot_token
+        self.shards = shards
+        self.base_url = base_url
+        self.running = False
+        
+        self.message_delay = message_delay
+        self.start_schedulers = start_schedulers
+        
+        # spawn keeps workers clear of the front's threads and open connections
+        self.context = multiprocessing.get_context('spawn')
+        self.update_queues = [self.context.Queue() for _ in range(shards)]
+        self.result_queue = self.context.Queue()
+        self.workers = [None] * shards
+        
+        from news_fetcher import NewsFetcher
+        self.news_fetcher = NewsFetcher()
+        
+        # Fan-out commands share result_queue, so they run one at a time
+        self.fanout_lock = asyncio.Lock()
+        self.next_request_id = 0
+    
+    def parse_command(self, update) -> List[str]:
+        """Command name and arguments of an update, or an empty list if it isn't a command"""
+        message = update.effective_message
+        text = message.text if message and message.text else ''
+        if not text.startswith('/'):
+            return []
+        
+        parts = text.split()
+        return [parts[0][1:].split('@')[0].lower()] + parts[1:]
+    
+    def route(self, update) -> int:
+        """Shard that should handle an update"""
+        command = self.parse_command(update)
+        
+        # User info lives with the user being looked up, not the admin asking
+        if command[:1] == ['userinfo'] and len(command) > 1 and command[1].isdigit():
+            return shard_for(command[1], self.shards)
+        
+        # A user's data lives on one shard whichever chat they write from
+        if update.effective_user is not None:
+            return shard_for(update.effective_user.id, self.shards)
+        if update.effective_chat is not None:
+            return shard_for(update.effective_chat.id, self.shards)
+        return 0
+    
+    async def forward_update(self, update, context):
+        """Hand an update to the worker that owns it, or run a fan-out command on all of them"""
+        command = self.parse_command(update)
+        if command and command[0] in FANOUT_COMMANDS:
+            # Broadcasts take a while, don't hold up routing everyone else's updates
+            context.application.create_task(self.run_fanout_command(update, command[0], command[1:]), update=update)
+            return
+        
+        self.update_queues[self.route(update)].put(('update', update.to_dict()))
+    
+    def start_worker(self, shard: int):
+        """Start the worker process of a shard"""
+        worker = self.context.Process(
+            target=run_worker,
+            args=(shard, self.update_queues[shard], self.result_queue, self.base_url,
+                  self.message_delay, self.start_schedulers),
+            daemon=True
+        )
+        worker.start()
+        self.workers[shard] = worker
+    
+    def check_workers(self) -> List[int]:
+        """Restart every worker process that has died, returning their shards"""
+        if not self.running:
+            return []
+        
+        dead = [shard for shard, worker in enumerate(self.workers) if not worker.is_alive()]
+        for shard in dead:
+            logger.error(f"Shard {shard} worker exited with code {self.workers[shard].exitcode}, "
+                         f"restarting it and dropping the updates queued for it")
+            # A process killed mid-read can leave its queue locked, and the updates in it are lost anyway
+            self.update_queues[shard] = self.context.Queue()
+            self.start_worker(shard)
+        return dead
+    
+    def is_admin(self, user_id: int) -> bool:
+        """Check if user is an admin"""
+        return user_id in self.news_fetcher.config.get('admin_user_ids', [])
+    
+    async def run_fanout_command(self, update, command: str, args: List[str]):
+        """Run an admin command on every shard and answer once with the combined result"""
+        if update.effective_user is None or not self.is_admin(update.effective_user.id):
+            await update.effective_message.reply_text("❌ You don't have permission to use this command.")
+            return
+        
+        if command == 'broadcast' and not args:
+            await update.effective_message.reply_text("Please provide a message to broadcast.\nExample: /broadcast Hello everyone!")
+            return
+        
+        async with self.fanout_lock:
+            if command == 'adminstats':
+                results = await self.collect('adminstats', None, STATS_TIMEOUT)
+                if not results:
+                    await update.effective_message.reply_text("Sorry, no shard answered in time.")
+                    return
+                reply = self.format_stats(list(results.values()))
+            else:
+                await update.effective_message.reply_text(f"Broadcasting message to the users of {self.shards} shards...")
+                # No timeout, a big broadcast takes as long as it takes; dead workers end the wait instead
+                results = await self.collect('broadcast', ' '.join(args))
+                sent_count = sum(sent for sent, _ in results.values())
+                failed_count = sum(failed for _, failed in results.values())
+                reply = f"✅ Broadcast complete!\nSent: {sent_count}\nFailed: {failed_count}"
+        
+        missing = [str(shard) for shard in range(self.shards) if shard not in results]
+        if missing:
+            logger.error(f"Shards {', '.join(missing)} did not answer /{command}")
+            reply += f"\n\n⚠️ No answer from shard {', '.join(missing)}, the result is partial."
+        await update.effective_message.reply_text(reply, parse_mode='Markdown' if command == 'adminstats' else None)
+    
+    async def collect(self, kind: str, payload, timeout: float = None) -> Dict[int, object]:
+        """Send a request to every shard and wait for their answers"""
+        self.next_request_id += 1
+        request_id = self.next_request_id
+        
+        for update_queue in self.update_queues:
+            update_queue.put((kind, request_id if payload is None else (request_id, payload)))
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.wait_for, kind, timeout, request_id)
+    
+    def format_stats(self, results: List[Dict]) -> str:
+        """One /adminstats reply covering every shard"""
+        from reply_cache import format_cache_summary
+        from stats import format_stats_summary, merge_stats
+        
+        stats_summary = format_stats_summary(merge_stats([result['stats'] for result in results]))
+        hits, misses, categories = (sum(counts) for counts in zip(*(result['cache'] for result in results)))
+        return f"{stats_summary}\n{format_cache_summary(hits, misses, categories)}"
+    
+    def wait_for(self, kind: str, timeout: float = None, request_id: int = None) -> Dict[int, object]:
+        """Wait until every worker has reported the given event, returning their results by shard.
+        
+        Workers that die or get restarted meanwhile will never answer, so
+        they are given up on and the results can be partial, as they are
+        when the timeout runs out.
+        """
+        workers = list(self.workers)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = {}
+        
+        while True:
+            pending = [
+                shard for shard in range(self.shards)
+                if shard not in results and workers[shard] is self.workers[shard] and workers[shard].is_alive()
+            ]
+            if not pending:
+                return results
+            
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return results
+            
+            # Wake up regularly to notice dead workers
+            try:
+                event, shard, payload = self.result_queue.get(timeout=1 if remaining is None else min(1, remaining))
+            except queue.Empty:
+                continue
+            if event != kind:
+                continue
+            if request_id is not None:
+                # Late answers to a request that already timed out are dropped
+                answer_id, payload = payload
+                if answer_id != request_id:
+                    continue
+            results[shard] = payload
+    
+    def start(self, timeout: float = 60):
+        """Split the user data, publish the feeds and start the workers"""
+        prepare_shard_files(self.shards)
+        self.news_fetcher.publish_shared_cache(FEED_CACHE_FILE)
+        
+        self.running = True
+        for shard in range(self.shards):
+            self.start_worker(shard)
+        
+        ready = self.wait_for('ready', timeout)
+        if len(ready) < self.shards:
+            self.stop()
+            raise RuntimeError(f"Only {len(ready)} of {self.shards} shard workers started")
+        
+        def ingest():
+            while self.running:
+                time.sleep(self.news_fetcher.cache_ttl)
+                self.news_fetcher.publish_shared_cache(FEED_CACHE_FILE)
+        
+        def watch_workers():
+            while self.running:
+                time.sleep(WORKER_CHECK_INTERVAL)
+                self.check_workers()
+        
+        threading.Thread(target=ingest, daemon=True).start()
+        threading.Thread(target=watch_workers, daemon=True).start()
+        logger.info(f"Started {self.shards} shard workers")
+    
+    def deliver(self, timeout: float = None):
+        """Run scheduled delivery on every shard at once and wait for all of them"""
+        for update_queue in self.update_queues:
+            update_queue.put(('deliver', None))
+        
+        delivered = self.wait_for('delivered', timeout)
+        if len(delivered) < self.shards:
+            logger.error(f"Only {len(delivered)} of {self.shards} shards finished delivery")
+    
+    def stop(self):
+        """Stop the workers"""
+        self.running = False
+        for update_queue in self.update_queues:
+            update_queue.put(('stop', None))
+        for worker in self.workers:
+            if worker is not None:
+                worker.join(timeout=30)
+    
+    def run(self):
+        """Poll Telegram and route every update until interrupted"""
+        from telegram import Update
+        from telegram.ext import Application, TypeHandler
+        
+        self.start()
+        
+        application = Application.builder().token(self.bot_token).base_url(self.base_url).build()
+        application.add_handler(TypeHandler(Update, self.forward_update))
+        
+        try:
+            application.run_polling(allowed_updates=Update.ALL_TYPES)
+        finally:
+            self.stop()
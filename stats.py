@@ -1,7 +1,7 @@
 import json
 import os
 from datetime import datetime, date
-from typing import Dict
+from typing import Dict, List
 
 class StatsManager:
     def __init__(self, stats_file='bot_stats.json'):
@@ -30,7 +30,10 @@ class StatsManager:
                 'business': 0,
                 'subscribe': 0,
                 'unsubscribe': 0,
-                'mysubs': 0
+                'mysubs': 0,
+                'follow': 0,
+                'unfollow': 0,
+                'following': 0
             },
             'daily_stats': {},
             'category_requests': {
@@ -57,8 +60,9 @@ class StatsManager:
         """Record command usage"""
         today = date.today().isoformat()
         
-        if command in self.stats['commands_used']:
-            self.stats['commands_used'][command] += 1
+        # Stats files written before a command existed don't have its counter yet
+        self.stats['commands_used'].setdefault(command, 0)
+        self.stats['commands_used'][command] += 1
         
         if today not in self.stats['daily_stats']:
             self.stats['daily_stats'][today] = {
@@ -98,29 +102,43 @@ class StatsManager:
     
     def get_stats_summary(self) -> str:
         """Get formatted statistics summary"""
-        total_commands = sum(self.stats['commands_used'].values())
-        most_used_cmd = max(self.stats['commands_used'], key=self.stats['commands_used'].get)
-        most_requested_category = max(self.stats['category_requests'], key=self.stats['category_requests'].get)
-        
-        summary = f"""📊 Bot Statistics Summary
+        return format_stats_summary(self.stats)
+
+def merge_stats(parts: List[Dict]) -> Dict:
+    """Add up the counters of several stats dicts, e.g. one per shard"""
+    merged = {'total_users': 0, 'commands_used': {}, 'category_requests': {}, 'subscription_counts': {}}
+    for stats in parts:
+        merged['total_users'] += stats.get('total_users', 0)
+        for key in ('commands_used', 'category_requests', 'subscription_counts'):
+            for name, count in stats.get(key, {}).items():
+                merged[key][name] = merged[key].get(name, 0) + count
+    return merged
+
+def format_stats_summary(stats: Dict) -> str:
+    """Get formatted statistics summary"""
+    total_commands = sum(stats['commands_used'].values())
+    most_used_cmd = max(stats['commands_used'], key=stats['commands_used'].get)
+    most_requested_category = max(stats['category_requests'], key=stats['category_requests'].get)
+    
+    summary = f"""📊 Bot Statistics Summary
         
-👥 Total Users: {self.stats['total_users']}
+👥 Total Users: {stats['total_users']}
 🔧 Total Commands Used: {total_commands}
-📈 Most Used Command: /{most_used_cmd} ({self.stats['commands_used'][most_used_cmd]} times)
-📰 Most Requested Category: {most_requested_category} ({self.stats['category_requests'][most_requested_category]} requests)
+📈 Most Used Command: /{most_used_cmd} ({stats['commands_used'][most_used_cmd]} times)
+📰 Most Requested Category: {most_requested_category} ({stats['category_requests'][most_requested_category]} requests)
 
 📊 Command Usage:
 """
+    
+    for cmd, count in stats['commands_used'].items():
+        summary += f"  /{cmd}: {count}\n"
+    
+    summary += f"\n📚 Category Requests:\n"
+    for category, count in stats['category_requests'].items():
+        summary += f"  {category}: {count}\n"
+    
+    summary += f"\n📝 Active Subscriptions:\n"
+    for category, count in stats['subscription_counts'].items():
+        summary += f"  {category}: {count}\n"
         
-        for cmd, count in self.stats['commands_used'].items():
-            summary += f"  /{cmd}: {count}\n"
-        
-        summary += f"\n📚 Category Requests:\n"
-        for category, count in self.stats['category_requests'].items():
-            summary += f"  {category}: {count}\n"
-        
-        summary += f"\n📝 Active Subscriptions:\n"
-        for category, count in self.stats['subscription_counts'].items():
-            summary += f"  {category}: {count}\n"
-            
-        return summary
\ No newline at end of file
+    return summary
\ No newline at end of file
@@ -0,0 +1,60 @@
+from digest import MAX_MESSAGE_LENGTH, DigestBuilder, article_id
+
+
+class FakeFetcher:
+    def __init__(self, articles):
+        self.articles = articles
+
+    def get_news(self, category, limit):
+        return self.articles.get(category, [])[:limit]
+
+
+def make_articles(category, count, title_length=20):
+    return [
+        {'title': f"{category} {index} ".ljust(title_length, 'x'), 'summary': 'summary', 'link': f"https://example.com/{category}/{index}"}
+        for index in range(count)
+    ]
+
+
+def test_skips_articles_already_seen():
+    articles = make_articles('tech', 4)
+    builder = DigestBuilder(FakeFetcher({'tech': articles}), articles_per_category=2)
+
+    text, ids = builder.build(('tech',), [article_id(articles[0])])
+
+    assert ids == [article_id(articles[1]), article_id(articles[2])]
+    assert articles[0]['link'] not in text
+    assert articles[1]['link'] in text
+
+
+def test_nothing_new_builds_no_digest():
+    articles = make_articles('tech', 2)
+    builder = DigestBuilder(FakeFetcher({'tech': articles}), articles_per_category=2)
+
+    assert builder.build(('tech',), [article_id(item) for item in articles]) is None
+
+
+def test_drops_whole_articles_when_too_long():
+    articles = {
+        'general': make_articles('general', 2, title_length=1500),
+        'tech': make_articles('tech', 2, title_length=1500)
+    }
+    builder = DigestBuilder(FakeFetcher(articles), articles_per_category=2)
+
+    text, ids = builder.build(('general', 'tech'), [])
+
+    assert len(text) <= MAX_MESSAGE_LENGTH
+    assert ids == [article_id(item) for item in articles['general']]
+    # Every article that made it in is complete, including its link
+    for item in articles['general']:
+        assert f"[Read more]({item['link']})" in text
+    assert not text.endswith('...')
+
+
+def test_titles_are_escaped():
+    articles = [{'title': 'Rust_lang *stable* [v2]', 'summary': '', 'link': 'https://example.com/rust'}]
+    builder = DigestBuilder(FakeFetcher({'tech': articles}))
+
+    text, _ = builder.build(('tech',), [])
+
+    assert 'Rust\\_lang \\*stable\\* \\[v2]' in text
@@ -0,0 +1,30 @@
+from keyword_matcher import KeywordMatcher
+
+
+def test_matches_whole_words_only():
+    matcher = KeywordMatcher({'ai': ['1']})
+
+    assert matcher.find_keywords('AI beats humans at chess') == {'ai'}
+    assert matcher.find_keywords('Minister said nothing') == set()
+    assert matcher.find_keywords('Rain in Spain') == set()
+
+
+def test_word_boundaries_include_punctuation():
+    matcher = KeywordMatcher({'ai': ['1']})
+
+    assert matcher.find_keywords('New rules for (AI), again.') == {'ai'}
+    assert matcher.find_keywords('ai') == {'ai'}
+
+
+def test_phrases_and_overlapping_keywords():
+    matcher = KeywordMatcher({'climate': ['1'], 'climate change': ['2'], 'change': ['3']})
+
+    assert matcher.find_keywords('Climate   change talks stall') == {'climate', 'climate change', 'change'}
+    assert matcher.find_keywords('Climatechange') == set()
+
+
+def test_match_maps_users_to_their_keywords():
+    matcher = KeywordMatcher({'python': ['1', '2'], 'rust': ['2'], 'go': ['3']})
+
+    assert matcher.match('Python and Rust in the kernel') == {'1': {'python'}, '2': {'python', 'rust'}}
+    assert matcher.match('Nothing relevant') == {}
@@ -0,0 +1,50 @@
+import pytest
+from telegram import Update
+
+from sharding import ShardedBot, shard_for
+
+SHARDS = 4
+
+
+@pytest.fixture
+def sharded():
+    return ShardedBot('123456:test-token', SHARDS)
+
+
+def message_update(text, user_id=None, chat_id=None, chat_type='private'):
+    message = {'message_id': 1, 'date': 0, 'text': text, 'chat': {'id': chat_id or user_id, 'type': chat_type}}
+    if user_id is not None:
+        message['from'] = {'id': user_id, 'is_bot': False, 'first_name': 'Test'}
+    return Update.de_json({'update_id': 1, 'message': message}, None)
+
+
+def test_routes_by_user_not_chat(sharded):
+    # Pick a group whose chat ID hashes to a different shard than the user
+    user_id = 1001
+    chat_id = next(chat for chat in range(-100, -200, -1) if shard_for(chat, SHARDS) != shard_for(user_id, SHARDS))
+
+    private = message_update('/subscribe tech', user_id)
+    group = message_update('/subscribe tech', user_id, chat_id, 'group')
+
+    assert sharded.route(private) == shard_for(user_id, SHARDS)
+    assert sharded.route(group) == shard_for(user_id, SHARDS)
+
+
+def test_falls_back_to_chat_without_user(sharded):
+    update = Update.de_json({
+        'update_id': 1,
+        'channel_post': {'message_id': 1, 'date': 0, 'text': 'hello', 'chat': {'id': -1005, 'type': 'channel'}}
+    }, None)
+
+    assert sharded.route(update) == shard_for(-1005, SHARDS)
+
+
+def test_userinfo_goes_to_the_looked_up_user(sharded):
+    update = message_update('/userinfo 424242', user_id=1)
+
+    assert sharded.route(update) == shard_for('424242', SHARDS)
+
+
+def test_fanout_commands_are_parsed_with_bot_suffix(sharded):
+    assert sharded.parse_command(message_update('/broadcast@news_bot hi all', user_id=1)) == ['broadcast', 'hi', 'all']
+    assert sharded.parse_command(message_update('hello', user_id=1)) == []
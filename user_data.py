@@ -1,17 +1,36 @@
 import json
 import os
-from typing import Dict, List, Set
+import threading
+from typing import Dict, List, Set, Tuple
+from digest import ARTICLE_ID_LENGTH
+from keyword_matcher import normalize_keyword
 
 class UserDataManager:
     def __init__(self, data_file='users.json'):
         self.data_file = data_file
         self.users_data = self.load_data()
+        # Delivery history lives in its own file, e.g. users.seen.json, so the
+        # users.json rewrite on /start or /subscribe stays small. Only the
+        # delivery and alert jobs write it.
+        base, ext = os.path.splitext(data_file)
+        self.seen_file = f"{base}.seen{ext}"
+        self.seen_data = self.load_json(self.seen_file)
+        # Handlers and the scheduler thread both change users_data
+        self.lock = threading.Lock()
+        # Held across snapshot and write so an older snapshot never replaces a newer one
+        self.save_lock = threading.Lock()
+        # Bumped on every keyword change so matchers know when to rebuild
+        self.keywords_version = 0
     
     def load_data(self) -> Dict:
         """Load user data from file"""
-        if os.path.exists(self.data_file):
+        return self.load_json(self.data_file)
+    
+    def load_json(self, path: str) -> Dict:
+        """Load a JSON object from file, empty if it is missing or unreadable"""
+        if os.path.exists(path):
             try:
-                with open(self.data_file, 'r') as f:
+                with open(path, 'r') as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError):
                 return {}
@@ -19,23 +38,43 @@ class UserDataManager:
     
     def save_data(self):
         """Save user data to file"""
-        try:
-            with open(self.data_file, 'w') as f:
-                json.dump(self.users_data, f, indent=2)
-        except IOError as e:
-            print(f"Error saving data: {e}")
+        self.save_json(self.data_file, self.users_data)
+    
+    def save_seen_data(self):
+        """Save the delivery history to its own file"""
+        self.save_json(self.seen_file, self.seen_data)
+    
+    def save_json(self, path: str, data: Dict):
+        """Write a snapshot of one of the data dicts to file"""
+        with self.save_lock:
+            # Users' lists are replaced rather than changed in place, so copying
+            # two levels is enough to serialize outside the lock
+            with self.lock:
+                snapshot = {uid: dict(user) for uid, user in data.items()}
+            payload = json.dumps(snapshot, separators=(',', ':'))
+            
+            # Write then rename so a crash mid-write never leaves a truncated file
+            temp_file = f"{path}.tmp"
+            try:
+                with open(temp_file, 'w') as f:
+                    f.write(payload)
+                os.replace(temp_file, path)
+            except IOError as e:
+                print(f"Error saving data: {e}")
     
     def register_user(self, user_id: int, username: str = None):
         """Register a new user"""
         user_id_str = str(user_id)
-        if user_id_str not in self.users_data:
+        with self.lock:
+            if user_id_str in self.users_data:
+                return
             self.users_data[user_id_str] = {
                 'username': username,
                 'subscriptions': [],
                 'active': True,
                 'last_news_time': None
             }
-            self.save_data()
+        self.save_data()
     
     def get_user_subscriptions(self, user_id: int) -> List[str]:
         """Get user's subscriptions"""
@@ -47,28 +86,111 @@ class UserDataManager:
     def add_subscription(self, user_id: int, category: str):
         """Add a subscription for user"""
         user_id_str = str(user_id)
-        if user_id_str in self.users_data:
+        with self.lock:
+            if user_id_str not in self.users_data:
+                return False
             subscriptions = self.users_data[user_id_str].get('subscriptions', [])
-            if category not in subscriptions:
-                subscriptions.append(category)
-                self.users_data[user_id_str]['subscriptions'] = subscriptions
-                self.save_data()
-                return True
-        return False
+            if category in subscriptions:
+                return False
+            self.users_data[user_id_str]['subscriptions'] = subscriptions + [category]
+        self.save_data()
+        return True
     
     def remove_subscription(self, user_id: int, category: str):
         """Remove a subscription for user"""
         user_id_str = str(user_id)
-        if user_id_str in self.users_data:
+        with self.lock:
+            if user_id_str not in self.users_data:
+                return False
             subscriptions = self.users_data[user_id_str].get('subscriptions', [])
-            if category in subscriptions:
-                subscriptions.remove(category)
-                self.users_data[user_id_str]['subscriptions'] = subscriptions
-                self.save_data()
-                return True
-        return False
+            if category not in subscriptions:
+                return False
+            self.users_data[user_id_str]['subscriptions'] = [sub for sub in subscriptions if sub != category]
+        self.save_data()
+        return True
     
     def get_all_active_users(self) -> List[str]:
         """Get all active users"""
-        return [uid for uid, data in self.users_data.items() 
-                if data.get('active', True)]
\ No newline at end of file
+        with self.lock:
+            return [uid for uid, data in self.users_data.items() 
+                    if data.get('active', True)]
+    
+    def get_subscription_groups(self) -> Dict[Tuple[str, ...], List[str]]:
+        """Group active users by their exact set of subscriptions"""
+        groups = {}
+        with self.lock:
+            for uid, data in self.users_data.items():
+                subscriptions = data.get('subscriptions', [])
+                if data.get('active', True) and subscriptions:
+                    groups.setdefault(tuple(sorted(subscriptions)), []).append(uid)
+        return groups
+    
+    def get_seen_articles(self, user_id: int, field: str = 'seen_articles') -> List[str]:
+        """Get fingerprints of the articles most recently sent to a user.
+        
+        Digests use seen_articles and keyword alerts seen_alerts, so one
+        kind of message never pushes the other's history out.
+        """
+        # Stored as one string of fixed length fingerprints, oldest first
+        seen = self.seen_data.get(str(user_id), {}).get(field, '')
+        return [seen[i:i + ARTICLE_ID_LENGTH] for i in range(0, len(seen), ARTICLE_ID_LENGTH)]
+    
+    def mark_articles_seen(self, user_id: int, article_ids: List[str], max_seen: int = 50,
+                           field: str = 'seen_articles'):
+        """Remember articles sent to a user, keeping only the newest max_seen.
+        
+        Does not save, call save_seen_data() once the whole delivery run is done.
+        """
+        user_id_str = str(user_id)
+        with self.lock:
+            if user_id_str in self.users_data:
+                history = self.seen_data.setdefault(user_id_str, {})
+                seen = history.get(field, '') + ''.join(article_ids)
+                history[field] = seen[-max_seen * ARTICLE_ID_LENGTH:]
+    
+    def get_user_keywords(self, user_id: int) -> List[str]:
+        """Get the keywords a user follows"""
+        user_id_str = str(user_id)
+        if user_id_str in self.users_data:
+            return self.users_data[user_id_str].get('keywords', [])
+        return []
+    
+    def add_keyword(self, user_id: int, keyword: str):
+        """Follow a keyword for user"""
+        user_id_str = str(user_id)
+        keyword = normalize_keyword(keyword)
+        with self.lock:
+            if user_id_str not in self.users_data or not keyword:
+                return False
+            keywords = self.users_data[user_id_str].get('keywords', [])
+            if keyword in keywords:
+                return False
+            self.users_data[user_id_str]['keywords'] = keywords + [keyword]
+            self.keywords_version += 1
+        self.save_data()
+        return True
+    
+    def remove_keyword(self, user_id: int, keyword: str):
+        """Unfollow a keyword for user"""
+        user_id_str = str(user_id)
+        keyword = normalize_keyword(keyword)
+        with self.lock:
+            if user_id_str not in self.users_data:
+                return False
+            keywords = self.users_data[user_id_str].get('keywords', [])
+            if keyword not in keywords:
+                return False
+            self.users_data[user_id_str]['keywords'] = [kw for kw in keywords if kw != keyword]
+            self.keywords_version += 1
+        self.save_data()
+        return True
+    
+    def get_keyword_index(self) -> Dict[str, List[str]]:
+        """Map every followed keyword to the active users following it"""
+        index = {}
+        with self.lock:
+            for uid, data in self.users_data.items():
+                if data.get('active', True):
+                    for keyword in data.get('keywords', []):
+                        index.setdefault(keyword, []).append(uid)
+        return index
\ No newline at end of file